@@ -2,45 +2,25 @@ from dash import Dash, html, dcc, dash_table, Input, Output, State, callback_con
 import plotly.express as px
 import pandas as pd
 import numpy as np
-import sqlite3
 import base64
 import io
 import calendar
 from datetime import datetime, date
 
-# Initialize SQLite database
-def init_db():
-    conn = sqlite3.connect('sales.db')
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS sales (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            Date TEXT NOT NULL,
-            Product TEXT,
-            Sales_Amount REAL,
-            Opportunity_Status TEXT,
-            Total_Sales REAL
-        )
-    ''')
-    conn.close()
+from database import SalesDatabase
 
-def get_data():
+# Initialize database (monthly partitions in sales.db)
+db = SalesDatabase('sales.db')
+
+def get_data(start_date=None, end_date=None):
     try:
-        conn = sqlite3.connect('sales.db')
-        df = pd.read_sql_query('SELECT * FROM sales', conn)
-        conn.close()
-        if len(df) > 0:
-            df['Date'] = pd.to_datetime(df['Date'])
-        return df
+        return db.get_data(start_date, end_date)
     except:
         return pd.DataFrame()  # Return empty DataFrame if no data exists
 
-def save_to_db(df):
-    conn = sqlite3.connect('sales.db')
-    df.to_sql('sales', conn, if_exists='replace', index=False)
-    conn.close()
+def save_to_db(df, replace=False):
+    return db.save_dataframe(df, replace=replace)
 
-# Initialize database
-init_db()
 sales_data = pd.DataFrame()  # Start with empty DataFrame
 
 app = Dash(__name__)
@@ -65,6 +45,11 @@ upload_component = html.Div([
         },
         multiple=False
     ),
+    dcc.Checklist(
+        id='upload-replace',
+        options=[{'label': ' Replace all stored data with this upload (including closed months)', 'value': 'replace'}],
+        value=[]
+    ),
     html.Div(id='upload-output')
 ])
 
@@ -294,9 +279,10 @@ app.layout = html.Div([
      Output('end-month', 'value'),
      Output('end-day', 'value')],
     Input('upload-data', 'contents'),
-    State('upload-data', 'filename')
+    State('upload-data', 'filename'),
+    State('upload-replace', 'value')
 )
-def update_output(contents, filename):
+def update_output(contents, filename, replace_mode):
     if contents is None:
         df = get_data()
         if df.empty:
@@ -330,7 +316,9 @@ def update_output(contents, filename):
         if 'csv' in filename:
             df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
             df['Date'] = pd.to_datetime(df['Date'])
-            save_to_db(df)
+            skipped = save_to_db(df, replace='replace' in (replace_mode or []))
+            uploaded_months = df['Date'].dt.to_period('M').nunique()
+            df = get_data()
             
             columns = [{"name": i, "id": i} for i in df.columns]
             numeric_cols = df.select_dtypes(include=[np.number]).columns
@@ -343,7 +331,14 @@ def update_output(contents, filename):
             min_date = df['Date'].min()
             max_date = df['Date'].max()
             
-            return (html.Div(['Upload successful!']), df.to_dict('records'), columns,
+            if skipped and len(skipped) == uploaded_months:
+                message = [f"No rows saved: all uploaded months are closed and immutable ({', '.join(skipped)})."]
+            else:
+                message = ['Upload successful!']
+                if skipped:
+                    message.append(f" Skipped closed months (immutable): {', '.join(skipped)}")
+            
+            return (html.Div(message), df.to_dict('records'), columns,
                     numeric_options, numeric_cols[0],
                     numeric_options, numeric_cols[0],
                     categorical_options, categorical_cols[0],
@@ -352,6 +347,8 @@ def update_output(contents, filename):
                     numeric_options, numeric_cols[2] if len(numeric_cols) > 2 else numeric_cols[0],
                     min_date.year, min_date.month, min_date.day,
                     max_date.year, max_date.month, max_date.day)
+    except ValueError as e:
+        return [f'Error processing file: {e}'] + [[], []] + [[], None] * 6 + [None] * 6
     except Exception as e:
         return ['Error processing file.'] + [[], []] + [[], None] * 6 + [None] * 6
 
@@ -406,15 +403,17 @@ def update_graphs(data, timeseries_col, pie_col, category_col, plot_type,
     if not data or not timeseries_col or not pie_col or not category_col:
         return html.Div(), html.Div(), html.Div()
         
-    df = pd.DataFrame(data)
-    df['Date'] = pd.to_datetime(df['Date'])
-    
-    # Filter data by date range if dates are selected
+    # Filter data by date range if dates are selected; only the monthly
+    # partitions overlapping the range are read from the database
     if all([start_year, start_month, start_day]) and all([end_year, end_month, end_day]):
         start_date = pd.Timestamp(year=start_year, month=start_month, day=start_day)
         end_date = pd.Timestamp(year=end_year, month=end_month, day=end_day)
-        mask = (df['Date'] >= start_date) & (df['Date'] <= end_date)
-        df = df.loc[mask]
+        df = get_data(start_date, end_date)
+        if df.empty:
+            df = pd.DataFrame(columns=list(data[0].keys()))
+    else:
+        df = pd.DataFrame(data)
+        df['Date'] = pd.to_datetime(df['Date'])
     
     # Aggregate data by date
     daily_data = df.groupby('Date')[timeseries_col].sum().reset_index()
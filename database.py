@@ -1,38 +1,291 @@
+import re
 import sqlite3
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
 
+# Sales rows are stored in one table per calendar month (sales_YYYY_MM).
+# The sales_partitions manifest records each partition's date range so that
+# date-range queries only open the months they overlap. Months that have
+# closed are compacted once and marked immutable; only the current month
+# accepts writes.
+MANIFEST_TABLE = 'sales_partitions'
+LEGACY_TABLE = 'sales'
+UNDATED_TABLE = 'sales_undated'  # legacy rows without a Date, kept on migration
+
+
 class SalesDatabase:
     def __init__(self, db_path='sales.db'):
         self.db_path = db_path
+        self._immutable_cache = {}  # partition name -> DataFrame, never invalidated
         self.init_database()
 
     def init_database(self):
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS sales (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    Date TEXT NOT NULL,
-                    Product TEXT,
-                    Sales_Amount REAL,
-                    Opportunity_Status TEXT,
-                    Total_Sales REAL
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+                    name TEXT PRIMARY KEY,
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    immutable INTEGER NOT NULL DEFAULT 0
                 )
             ''')
+            legacy = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (LEGACY_TABLE,)
+            ).fetchone()
+        self._drop_staging_tables()
+        if legacy:
+            self._migrate_legacy_table()
+        self.seal_closed_partitions()
+
+    @staticmethod
+    def current_month():
+        return pd.Timestamp(datetime.now()).to_period('M')
+
+    @staticmethod
+    def partition_name(month):
+        return f'sales_{month.year:04d}_{month.month:02d}'
+
+    def _migrate_legacy_table(self):
+        # Older databases kept every row in a single `sales` table. The new
+        # partitions and the DROP of that table commit together, and only if
+        # every legacy row was written somewhere.
+        with sqlite3.connect(self.db_path) as conn:
+            df = pd.read_sql_query(f'SELECT * FROM {LEGACY_TABLE}', conn)
+        if 'id' in df.columns:
+            df = df.drop(columns=['id'])
+        self._write_partitions(df, drop_legacy=True)
+
+    def _drop_staging_tables(self):
+        # Leftovers from a write that failed before its partitions were swapped in
+        with self._transaction() as conn:
+            names = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'sales%'"
+            ).fetchall()
+            for (name,) in names:
+                if name.endswith(('_staging', '_compact')):
+                    conn.execute(f'DROP TABLE {name}')
+
+    def get_partitions(self, start_date=None, end_date=None):
+        """Return manifest rows for partitions overlapping [start_date, end_date]."""
+        query = f'SELECT name, start_date, end_date, row_count, immutable FROM {MANIFEST_TABLE}'
+        conditions, params = [], []
+        if end_date is not None:
+            conditions.append('start_date <= ?')
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+        if start_date is not None:
+            conditions.append('end_date >= ?')
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY start_date'
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {'name': name, 'start_date': start, 'end_date': end,
+             'row_count': row_count, 'immutable': bool(immutable)}
+            for name, start, end, row_count, immutable in rows
+        ]
+
+    def save_dataframe(self, df, replace=False):
+        """Write rows into their monthly partitions.
+
+        Months without a partition are created, the current month is
+        replaced with the uploaded rows, and rows for immutable months are
+        skipped. With replace=True all stored data, including immutable
+        months, is swapped for df in one transaction and the columns may
+        differ. Raises ValueError if the columns do not match the stored
+        partitions or any row has no Date. Returns the list of months that
+        were skipped.
+        """
+        stored_columns = [] if replace else self.get_column_names()
+        if stored_columns and set(df.columns) != set(stored_columns):
+            raise ValueError(
+                'Uploaded columns do not match the stored sales data. '
+                f"Expected: {', '.join(stored_columns)}; "
+                f"got: {', '.join(map(str, df.columns))}"
+            )
+        undated = pd.to_datetime(df['Date']).isna().sum()
+        if undated:
+            raise ValueError(f'{undated} uploaded row(s) have no Date; nothing was saved.')
+        return self._write_partitions(df, replace=replace)
+
+    def reset(self):
+        """Delete all stored sales data, including immutable months."""
+        with self._transaction() as conn:
+            self._drop_all_partitions(conn)
+        self._immutable_cache.clear()
+
+    def _drop_all_partitions(self, conn):
+        for (name,) in conn.execute(f'SELECT name FROM {MANIFEST_TABLE}').fetchall():
+            conn.execute(f'DROP TABLE IF EXISTS {name}')
+        conn.execute(f'DROP TABLE IF EXISTS {UNDATED_TABLE}')
+        conn.execute(f'DELETE FROM {MANIFEST_TABLE}')
+
+    def _write_partitions(self, df, drop_legacy=False, replace=False):
+        if not replace:
+            # Seal months that closed while the app was running before
+            # deciding which partitions may still be written
+            self.seal_closed_partitions()
+        df = df.copy()
+        df['Date'] = pd.to_datetime(df['Date'])
+        current = self.current_month()
+        existing = {} if replace else {p['name']: p for p in self.get_partitions()}
+        skipped = []
+        staged = []
+        undated = df[df['Date'].isna()]
+
+        # Stage each month in its own table first; pandas commits as it
+        # writes, so the visible partitions are only swapped in below
+        with sqlite3.connect(self.db_path) as conn:
+            if drop_legacy and len(undated) > 0:
+                undated.to_sql(f'{UNDATED_TABLE}_staging', conn, if_exists='replace', index=False)
+            for month, month_df in df.groupby(df['Date'].dt.to_period('M')):
+                name = self.partition_name(month)
+                if name in existing and existing[name]['immutable']:
+                    skipped.append(str(month))
+                    continue
+                month_df = month_df.sort_values('Date', kind='stable')
+                month_df.to_sql(f'{name}_staging', conn, if_exists='replace', index=False)
+                staged.append((name, month, len(month_df), month < current))
+
+        with self._transaction() as conn:
+            if replace:
+                self._drop_all_partitions(conn)
+            for name, month, row_count, closed in staged:
+                conn.execute(f'DROP TABLE IF EXISTS {name}')
+                conn.execute(f'ALTER TABLE {name}_staging RENAME TO {name}')
+                conn.execute(
+                    f'INSERT OR REPLACE INTO {MANIFEST_TABLE} '
+                    '(name, start_date, end_date, row_count, immutable) VALUES (?, ?, ?, ?, ?)',
+                    (name, month.start_time.strftime('%Y-%m-%d'),
+                     month.end_time.strftime('%Y-%m-%d'), row_count, int(closed))
+                )
+            if drop_legacy:
+                if len(undated) > 0:
+                    conn.execute(f'DROP TABLE IF EXISTS {UNDATED_TABLE}')
+                    conn.execute(f'ALTER TABLE {UNDATED_TABLE}_staging RENAME TO {UNDATED_TABLE}')
+                written = sum(row_count for _, _, row_count, _ in staged) + len(undated)
+                if written != len(df):
+                    raise RuntimeError(
+                        f'Migrating {LEGACY_TABLE} wrote {written} of {len(df)} rows; '
+                        'keeping the legacy table'
+                    )
+                conn.execute(f'DROP TABLE {LEGACY_TABLE}')
+        if replace:
+            self._immutable_cache.clear()
+        return skipped
 
     def import_from_csv(self, csv_path):
         df = pd.read_csv(csv_path)
-        with sqlite3.connect(self.db_path) as conn:
-            df.to_sql('sales', conn, if_exists='replace', index=False)
+        self.save_dataframe(df)
         return True
 
-    def get_all_data(self):
+    def seal_closed_partitions(self):
+        """Compact partitions whose month has ended and mark them immutable."""
+        current = self.current_month()
+        to_seal = [
+            p['name'] for p in self.get_partitions()
+            if not p['immutable'] and pd.Period(p['start_date'], freq='M') < current
+        ]
+        if not to_seal:
+            return []
+
+        for name in to_seal:
+            # Rebuild the table in date order so each month's rows are
+            # contiguous. The swap and manifest update commit together, so a
+            # failure leaves the old table. Freed pages are reused by later
+            # writes; vacuum() returns them to the OS on request.
+            with self._transaction() as conn:
+                conn.execute(f'DROP TABLE IF EXISTS {name}_compact')
+                # Reuse the declared schema; CREATE TABLE ... AS SELECT would
+                # drop the column types pandas wrote for the open month
+                (create_sql,) = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+                ).fetchone()
+                create_sql = re.sub(
+                    rf'^CREATE TABLE\s+("?){name}\1', f'CREATE TABLE "{name}_compact"', create_sql, count=1
+                )
+                conn.execute(create_sql)
+                conn.execute(f'INSERT INTO {name}_compact SELECT * FROM {name} ORDER BY Date')
+                conn.execute(f'DROP TABLE {name}')
+                conn.execute(f'ALTER TABLE {name}_compact RENAME TO {name}')
+                conn.execute(
+                    f'UPDATE {MANIFEST_TABLE} SET immutable = 1, '
+                    f'row_count = (SELECT COUNT(*) FROM {name}) WHERE name = ?',
+                    (name,)
+                )
+        return to_seal
+
+    @contextmanager
+    def _transaction(self):
+        # sqlite3 does not open implicit transactions for DDL, so manage
+        # BEGIN/COMMIT explicitly to make table swaps atomic
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def vacuum(self):
+        """Rewrite the whole database file to reclaim free pages.
+
+        This touches every partition, so it is a manual maintenance step and
+        is never run as part of a write.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+    def _read_partition(self, conn, partition):
+        name = partition['name']
+        if name in self._immutable_cache:
+            return self._immutable_cache[name]
+        df = pd.read_sql_query(f'SELECT * FROM {name}', conn)
+        df['Date'] = pd.to_datetime(df['Date'])
+        if partition['immutable']:
+            self._immutable_cache[name] = df
+        return df
+
+    def get_data(self, start_date=None, end_date=None):
+        """Return rows between start_date and end_date (inclusive).
+
+        Only partitions whose date range overlaps the request are opened.
+        """
+        partitions = self.get_partitions(start_date, end_date)
+        if not partitions:
+            return pd.DataFrame()
+
         with sqlite3.connect(self.db_path) as conn:
-            df = pd.read_sql_query('SELECT * FROM sales', conn)
-            df['Date'] = pd.to_datetime(df['Date'])
-            return df
+            frames = [self._read_partition(conn, p) for p in partitions]
+        df = pd.concat(frames, ignore_index=True)
+
+        if start_date is not None:
+            df = df[df['Date'] >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df['Date'] <= pd.Timestamp(end_date)]
+        return df.reset_index(drop=True)
+
+    def get_all_data(self):
+        return self.get_data()
 
     def get_column_names(self):
+        # Union of columns across partitions, in first-seen order
+        columns = []
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('SELECT * FROM sales LIMIT 1')
-            return [description[0] for description in cursor.description]
\ No newline at end of file
+            for partition in self.get_partitions():
+                cursor = conn.execute(f'SELECT * FROM {partition["name"]} LIMIT 1')
+                for description in cursor.description:
+                    if description[0] not in columns:
+                        columns.append(description[0])
+        return columns
@@ -0,0 +1,220 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from database import SalesDatabase
+
+CSV_PATH = Path(__file__).parent / 'Sales Dataset.csv'
+
+
+@pytest.fixture
+def two_month_db(tmp_path, monkeypatch):
+    # January is closed and immutable, February is the current month
+    monkeypatch.setattr(SalesDatabase, 'current_month', staticmethod(lambda: pd.Period('2023-02', 'M')))
+    db = SalesDatabase(str(tmp_path / 'sales.db'))
+    db.save_dataframe(pd.DataFrame({
+        'Date': ['2023-01-01', '2023-01-31', '2023-02-01', '2023-02-28'],
+        'Total': [1.0, 2.0, 3.0, 4.0],
+    }))
+    return db
+
+
+def table_names(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_migrates_to_sql_layout(tmp_path):
+    # Layout written by the old app.save_to_db: the upload replaced `sales`
+    db_path = str(tmp_path / 'sales.db')
+    df = pd.read_csv(CSV_PATH)
+    df['Date'] = pd.to_datetime(df['Date'])
+    with sqlite3.connect(db_path) as conn:
+        df.to_sql('sales', conn, if_exists='replace', index=False)
+
+    db = SalesDatabase(db_path)
+
+    migrated = db.get_all_data()
+    assert len(migrated) == len(df)
+    assert sorted(migrated.columns) == sorted(df.columns)
+    assert sum(p['row_count'] for p in db.get_partitions()) == len(df)
+    assert 'sales' not in table_names(db_path)
+
+
+def test_migrates_init_db_layout(tmp_path):
+    # Layout created by the old app.init_db, with an AUTOINCREMENT id
+    db_path = str(tmp_path / 'sales.db')
+    rows = [
+        ('2023-01-05', 'Laptop', 1200.0, 'Won', 1200.0),
+        ('2023-01-20', 'Phone', 800.0, 'Lost', 800.0),
+        ('2023-02-03', 'Tablet', 450.0, 'Pending', 450.0),
+    ]
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+            CREATE TABLE sales (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Date TEXT NOT NULL,
+                Product TEXT,
+                Sales_Amount REAL,
+                Opportunity_Status TEXT,
+                Total_Sales REAL
+            )
+        ''')
+        conn.executemany(
+            'INSERT INTO sales (Date, Product, Sales_Amount, Opportunity_Status, Total_Sales) '
+            'VALUES (?, ?, ?, ?, ?)',
+            rows
+        )
+
+    db = SalesDatabase(db_path)
+
+    migrated = db.get_all_data()
+    assert len(migrated) == len(rows)
+    assert 'id' not in migrated.columns
+    assert [p['name'] for p in db.get_partitions()] == ['sales_2023_01', 'sales_2023_02']
+    assert 'sales' not in table_names(db_path)
+
+
+def test_migration_keeps_rows_without_date(tmp_path):
+    db_path = str(tmp_path / 'sales.db')
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2023-01-05', None, '2023-02-03']),
+        'Product': ['Laptop', 'Phone', 'Tablet'],
+    })
+    with sqlite3.connect(db_path) as conn:
+        df.to_sql('sales', conn, if_exists='replace', index=False)
+
+    db = SalesDatabase(db_path)
+
+    assert len(db.get_all_data()) == 2
+    with sqlite3.connect(db_path) as conn:
+        undated = pd.read_sql_query('SELECT * FROM sales_undated', conn)
+    assert undated['Product'].tolist() == ['Phone']
+    assert 'sales' not in table_names(db_path)
+
+
+def test_migration_aborts_when_rows_would_be_lost(tmp_path):
+    # A legacy month that already has an immutable partition cannot be written
+    db_path = str(tmp_path / 'sales.db')
+    SalesDatabase(db_path).save_dataframe(pd.DataFrame({'Date': ['2023-01-02'], 'Product': ['Desktop']}))
+    legacy = pd.DataFrame({'Date': pd.to_datetime(['2023-01-05', '2023-02-03']), 'Product': ['Laptop', 'Tablet']})
+    with sqlite3.connect(db_path) as conn:
+        legacy.to_sql('sales', conn, if_exists='replace', index=False)
+
+    with pytest.raises(RuntimeError):
+        SalesDatabase(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM sales').fetchone() == (2,)
+    assert 'sales_2023_02' not in table_names(db_path)
+
+
+def test_rejects_mismatched_columns(tmp_path):
+    db = SalesDatabase(str(tmp_path / 'sales.db'))
+    db.import_from_csv(CSV_PATH)
+
+    with pytest.raises(ValueError):
+        db.save_dataframe(pd.DataFrame({'Date': ['2024-02-01'], 'Clicks': [10]}))
+    assert 'Clicks' not in db.get_column_names()
+
+
+def test_seals_month_that_closed_before_write(tmp_path, monkeypatch):
+    db = SalesDatabase(str(tmp_path / 'sales.db'))
+    monkeypatch.setattr(SalesDatabase, 'current_month', staticmethod(lambda: pd.Period('2023-01', 'M')))
+    db.save_dataframe(pd.DataFrame({'Date': ['2023-01-02'], 'Total': [1.0]}))
+    assert not db.get_partitions()[0]['immutable']
+
+    monkeypatch.setattr(SalesDatabase, 'current_month', staticmethod(lambda: pd.Period('2023-02', 'M')))
+    skipped = db.save_dataframe(pd.DataFrame({'Date': ['2023-01-05'], 'Total': [9.0]}))
+
+    assert skipped == ['2023-01']
+    assert db.get_all_data()['Total'].tolist() == [1.0]
+
+
+def test_sealing_keeps_declared_schema(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'sales.db')
+    db = SalesDatabase(db_path)
+    monkeypatch.setattr(SalesDatabase, 'current_month', staticmethod(lambda: pd.Period('2023-01', 'M')))
+    db.save_dataframe(pd.DataFrame({'Date': ['2023-01-02', '2023-01-01'], 'Total': [1.0, 2.0]}))
+
+    monkeypatch.setattr(SalesDatabase, 'current_month', staticmethod(lambda: pd.Period('2023-02', 'M')))
+    assert db.seal_closed_partitions() == ['sales_2023_01']
+
+    with sqlite3.connect(db_path) as conn:
+        column_types = {row[1]: row[2] for row in conn.execute('PRAGMA table_info(sales_2023_01)')}
+    assert column_types == {'Date': 'TIMESTAMP', 'Total': 'REAL'}
+    assert db.get_all_data()['Total'].tolist() == [2.0, 1.0]
+
+
+def test_rejects_rows_without_date(tmp_path):
+    db = SalesDatabase(str(tmp_path / 'sales.db'))
+
+    with pytest.raises(ValueError):
+        db.save_dataframe(pd.DataFrame({'Date': ['2023-02-03', None], 'Product': ['x', 'y']}))
+    assert db.get_partitions() == []
+
+
+def test_replace_swaps_dataset_and_reset_clears_it(tmp_path):
+    db = SalesDatabase(str(tmp_path / 'sales.db'))
+    db.import_from_csv(CSV_PATH)
+    db.get_all_data()  # populate the immutable cache
+
+    marketing = pd.DataFrame({'Date': ['2023-01-10', '2023-03-01'], 'Clicks': [10, 20]})
+    assert db.save_dataframe(marketing, replace=True) == []
+    assert db.get_column_names() == ['Date', 'Clicks']
+    assert db.get_all_data()['Clicks'].tolist() == [10, 20]
+    assert [p['name'] for p in db.get_partitions()] == ['sales_2023_01', 'sales_2023_03']
+
+    db.reset()
+    assert db.get_partitions() == []
+    assert db.get_all_data().empty
+
+
+def test_range_opens_only_overlapping_partitions(two_month_db, monkeypatch):
+    assert [p['name'] for p in two_month_db.get_partitions('2023-01-10', '2023-01-31')] == ['sales_2023_01']
+    assert [p['name'] for p in two_month_db.get_partitions('2023-01-31', '2023-02-01')] == [
+        'sales_2023_01', 'sales_2023_02'
+    ]
+    assert two_month_db.get_partitions('2023-03-01', '2023-03-31') == []
+
+    opened = []
+    read_partition = SalesDatabase._read_partition
+    monkeypatch.setattr(
+        SalesDatabase, '_read_partition',
+        lambda self, conn, p: opened.append(p['name']) or read_partition(self, conn, p)
+    )
+    df = two_month_db.get_data('2023-02-01', '2023-02-28')
+    assert opened == ['sales_2023_02']
+    assert df['Total'].tolist() == [3.0, 4.0]
+
+
+def test_range_edges_are_inclusive(two_month_db):
+    df = two_month_db.get_data('2023-01-31', '2023-02-01')
+    assert df['Total'].tolist() == [2.0, 3.0]
+
+
+def test_upload_replaces_current_month_only(two_month_db):
+    skipped = two_month_db.save_dataframe(pd.DataFrame({
+        'Date': ['2023-01-15', '2023-02-10'],
+        'Total': [99.0, 5.0],
+    }))
+
+    assert skipped == ['2023-01']
+    assert two_month_db.get_data()['Total'].tolist() == [1.0, 2.0, 5.0]
+    partitions = {p['name']: p for p in two_month_db.get_partitions()}
+    assert partitions['sales_2023_01']['immutable']
+    assert not partitions['sales_2023_02']['immutable']
+    assert partitions['sales_2023_02']['row_count'] == 1
+
+
+def test_immutable_partition_is_served_from_cache(two_month_db):
+    first = two_month_db.get_data('2023-01-01', '2023-01-31')
+    cached = two_month_db._immutable_cache['sales_2023_01']
+    assert 'sales_2023_02' not in two_month_db._immutable_cache
+
+    two_month_db.save_dataframe(pd.DataFrame({'Date': ['2023-01-20', '2023-02-05'], 'Total': [7.0, 8.0]}))
+
+    assert two_month_db._immutable_cache['sales_2023_01'] is cached
+    pd.testing.assert_frame_equal(two_month_db.get_data('2023-01-01', '2023-01-31'), first)